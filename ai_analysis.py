@@ -5,26 +5,66 @@ Handles OpenAI operations:
 - Step 5: Get Recommendations from ChatGPT
 """
 
+import logging
 import json
+import asyncio
+import openai
 from openai import OpenAI
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Tuple
+from circuit_breaker import CircuitBreaker, CircuitOpenError
 
+logger = logging.getLogger(__name__)
 
-def initialize_openai(api_key: str) -> OpenAI:
+# Stops calling OpenAI for a while after repeated outages
+openai_breaker = CircuitBreaker("OpenAI")
+
+
+def initialize_openai(api_key: str, timeout: float = 30) -> OpenAI:
     """
     Initialize OpenAI client
 
     Args:
         api_key: OpenAI API key
+        timeout: Seconds before an OpenAI request times out
 
     Returns:
         OpenAI client object
     """
-    client = OpenAI(api_key=api_key)
-    print("OpenAI API initialized")
+    client = OpenAI(api_key=api_key, timeout=timeout)
+    logger.info("OpenAI API initialized")
     return client
 
 
+def create_chat_completion(openai_client: OpenAI, **kwargs) -> Any:
+    """
+    Create a chat completion through the circuit breaker
+
+    Connection errors, timeouts and 5xx responses count toward opening the circuit,
+    other API errors (bad request, auth) mean OpenAI is up and don't.
+
+    Raises:
+        CircuitOpenError: If OpenAI has been failing and calls are blocked
+    """
+    openai_breaker.check()
+    try:
+        response = openai_client.chat.completions.create(**kwargs)
+    except openai.APIConnectionError:
+        openai_breaker.record_failure()
+        raise
+    except openai.APIStatusError as e:
+        if e.status_code >= 500:
+            openai_breaker.record_failure()
+        raise
+
+    openai_breaker.record_success()
+    return response
+
+
+def is_valid_recommendation(rec: Any) -> bool:
+    """True if rec is a {"song": ..., "artist": ...} recommendation"""
+    return isinstance(rec, dict) and "song" in rec and "artist" in rec
+
+
 def format_data_for_chatgpt(
     playlist_data: Dict[str, Any],
     reddit_data: List[Dict[str, Any]],
@@ -45,9 +85,9 @@ def format_data_for_chatgpt(
     Returns:
         str: Formatted prompt for ChatGPT
     """
-    print("=" * 80)
-    print("CREATING CHATGPT PROMPT")
-    print("=" * 80)
+    logger.info("=" * 80)
+    logger.info("CREATING CHATGPT PROMPT")
+    logger.info("=" * 80)
 
     # Build playlist summary
     playlist_summary = f"Playlist: {playlist_data['name']}\n"
@@ -117,14 +157,19 @@ def get_chatgpt_recommendations(
         max_tokens: Maximum tokens for response
 
     Returns:
-        list: List of song recommendations from ChatGPT
+        list: List of song recommendations from ChatGPT (empty if the response can't be parsed)
+
+    Raises:
+        CircuitOpenError: If OpenAI has been failing and calls are blocked
+        openai.APIError: If the OpenAI request itself failed
     """
-    print("=" * 80)
-    print("CALLING CHATGPT API")
-    print("=" * 80)
+    logger.info("=" * 80)
+    logger.info("CALLING CHATGPT API")
+    logger.info("=" * 80)
 
     try:
-        response = openai_client.chat.completions.create(
+        response = create_chat_completion(
+            openai_client,
             model=model,
             messages=[
                 {
@@ -138,26 +183,345 @@ def get_chatgpt_recommendations(
         )
 
         gpt_response = response.choices[0].message.content
-        print(f"ChatGPT Response received")
-        print(f"\nRaw response:")
-        print("-" * 80)
-        print(gpt_response)
-        print("-" * 80)
+        logger.info("ChatGPT Response received")
+        logger.info("Raw response:")
+        logger.info("-" * 80)
+        logger.info("%s", gpt_response)
+        logger.info("-" * 80)
 
         # Parse JSON response
         gpt_recommendations = json.loads(gpt_response)
 
-        print(f"\nParsed {len(gpt_recommendations)} recommendations:")
+        logger.info("Parsed %s recommendations:", len(gpt_recommendations))
         for idx, rec in enumerate(gpt_recommendations, 1):
-            print(f"   {idx}. {rec['song']} - {rec['artist']}")
+            logger.info("   %s. %s - %s", idx, rec["song"], rec["artist"])
 
         return gpt_recommendations
 
+    except (CircuitOpenError, openai.APIError):
+        # OpenAI is down or rejected the call, let the caller report it (an empty
+        # list would look like a successful request with no recommendations)
+        raise
     except Exception as e:
-        print(f"Error calling ChatGPT: {e}")
+        logger.error("Error calling ChatGPT: %s", e)
         return []
 
 
+class ChatGPTBatcher:
+    """
+    Step 5 (Batched): Coalesce concurrent ChatGPT requests into a single API call
+
+    Requests submitted within `window` seconds of each other (up to `max_batch_size`)
+    are merged into one prompt with "=== PLAYLIST {i} ===" separators and the JSON
+    response is split back out per request. Falls back to one concurrent call per
+    request if the batched call fails or its response can't be parsed.
+
+    Args:
+        model: GPT model to use
+        temperature: Temperature parameter for generation
+        max_tokens: Maximum tokens per request (scaled by batch size)
+        window: Seconds to wait for more requests after the first one arrives
+        max_batch_size: Maximum number of requests merged into one call
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4",
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        window: float = 0.05,
+        max_batch_size: int = 4,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queue = None
+        self._loop = None
+        self._worker = None
+        self._batch_tasks = set()
+
+    async def submit(
+        self, openai_client: OpenAI, chatgpt_prompt: str
+    ) -> List[Dict[str, str]]:
+        """
+        Queue a prompt and wait for its recommendations
+
+        Args:
+            openai_client: OpenAI client object
+            chatgpt_prompt: Formatted prompt string
+
+        Returns:
+            list: List of song recommendations from ChatGPT
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queue and worker are bound to the event loop they were created on
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect_batches())
+            self._batch_tasks = set()
+
+        future = loop.create_future()
+        await self._queue.put((openai_client, chatgpt_prompt, future))
+        return await future
+
+    async def close(self):
+        """Stop the background batching tasks, cancelling any requests still waiting"""
+        tasks = list(self._batch_tasks)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Requests queued but never picked up would otherwise wait forever
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+
+        self._batch_tasks = set()
+        self._queue = None
+        self._loop = None
+        self._worker = None
+
+    async def _collect_batches(self):
+        """Group queued requests into batches and send each batch off"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Don't wait on the API call, keep collecting the next batch
+            # (keep a reference, the event loop only holds weak ones to running tasks)
+            task = loop.create_task(self._process_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _process_batch(self, batch: List[Tuple[OpenAI, str, asyncio.Future]]):
+        """Send one batch to ChatGPT and resolve each request's future"""
+        try:
+            if len(batch) > 1:
+                try:
+                    results = await asyncio.to_thread(
+                        self._get_batched_recommendations, batch
+                    )
+                except Exception as e:
+                    # Fall back to one call per request so nobody loses their recommendations
+                    logger.warning(
+                        "Error in batched ChatGPT call (%s), falling back to single calls",
+                        e,
+                    )
+                else:
+                    for (_, _, future), recommendations in zip(batch, results):
+                        if not future.done():
+                            future.set_result(recommendations)
+                    return
+
+            # One call per request, all at the same time
+            # return_exceptions so each request gets its own result or error
+            results = await asyncio.gather(
+                *[
+                    asyncio.to_thread(
+                        get_chatgpt_recommendations,
+                        openai_client,
+                        chatgpt_prompt,
+                        self.model,
+                        self.temperature,
+                        self.max_tokens,
+                    )
+                    for openai_client, chatgpt_prompt, _ in batch
+                ],
+                return_exceptions=True,
+            )
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+        finally:
+            # Never leave a request waiting (e.g. the batcher was closed mid-call)
+            for _, _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    def _get_batched_recommendations(
+        self, batch: List[Tuple[OpenAI, str, asyncio.Future]]
+    ) -> List[List[Dict[str, str]]]:
+        """
+        Make one ChatGPT call for the whole batch, splitting the response per playlist
+
+        Raises:
+            Exception: If the call fails or the response can't be split per playlist
+        """
+        logger.info("=" * 80)
+        logger.info("CALLING CHATGPT API (BATCH OF %s)", len(batch))
+        logger.info("=" * 80)
+
+        batched_prompt = (
+            f"You will receive {len(batch)} independent recommendation requests, each "
+            "starting with an === PLAYLIST {i} === line. Answer each one on its own, "
+            "following its instructions exactly.\n"
+            "Return ONLY a JSON object mapping each playlist number to the JSON array "
+            'that request asks for, like {"1": [...], "2": [...]}.\n\n'
+        )
+        for idx, (_, chatgpt_prompt, _) in enumerate(batch, 1):
+            batched_prompt += f"=== PLAYLIST {idx} ===\n{chatgpt_prompt}\n\n"
+
+        # Every request ends with "return ONLY a JSON array", restate the batch format last so it wins
+        expected_format = ", ".join(
+            f'"{idx}": [...]' for idx in range(1, len(batch) + 1)
+        )
+        batched_prompt += (
+            "=== OUTPUT FORMAT ===\n"
+            'Ignore the "return a JSON array" output instructions in each request above. '
+            "Return ONE JSON object with a key for every playlist number, whose value is "
+            f"that playlist's array of recommendations: {{{expected_format}}}"
+        )
+
+        openai_client = batch[0][0]
+        response = create_chat_completion(
+            openai_client,
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a music recommendation expert. Always return valid JSON.",
+                },
+                {"role": "user", "content": batched_prompt},
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens * len(batch),
+            # JSON mode guarantees an object back instead of a bare array
+            response_format={"type": "json_object"},
+        )
+        batched_recommendations = json.loads(response.choices[0].message.content)
+        results = [
+            batched_recommendations[str(idx)] for idx in range(1, len(batch) + 1)
+        ]
+        # Same shape the single call would give, anything else goes to the fallback
+        if not all(
+            isinstance(recommendations, list)
+            and all(is_valid_recommendation(rec) for rec in recommendations)
+            for recommendations in results
+        ):
+            raise ValueError("batched response has a malformed playlist array")
+
+        logger.info("Batched ChatGPT response split into %s requests", len(results))
+        return results
+
+
+def parse_streamed_recommendations(
+    buffer: str, start: int = 0
+) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Parse every complete {"song": ..., "artist": ...} object in a partial JSON array
+
+    Args:
+        buffer: JSON text received so far
+        start: Index to resume parsing from
+
+    Returns:
+        tuple: (parsed recommendations, index to resume from on the next call)
+    """
+    decoder = json.JSONDecoder()
+    recommendations = []
+
+    while True:
+        object_start = buffer.find("{", start)
+        if object_start == -1:
+            return recommendations, start
+
+        try:
+            rec, end = decoder.raw_decode(buffer, object_start)
+        except json.JSONDecodeError:
+            # Object isn't complete yet, wait for more tokens
+            return recommendations, object_start
+
+        if is_valid_recommendation(rec):
+            recommendations.append(rec)
+        start = end
+
+
+def stream_chatgpt_recommendations(
+    openai_client: OpenAI,
+    chatgpt_prompt: str,
+    model: str = "gpt-4",
+    temperature: float = 0.7,
+    max_tokens: int = 500,
+) -> Iterator[Dict[str, str]]:
+    """
+    Step 5 (Streaming): Yield each ChatGPT recommendation as soon as it is complete
+
+    Args:
+        openai_client: OpenAI client object
+        chatgpt_prompt: Formatted prompt string
+        model: GPT model to use
+        temperature: Temperature parameter for generation
+        max_tokens: Maximum tokens for response
+
+    Yields:
+        dict: Song recommendation with 'song' and 'artist' keys
+
+    Raises:
+        CircuitOpenError: If OpenAI has been failing and calls are blocked
+        openai.APIError: If the OpenAI request itself failed
+    """
+    logger.info("=" * 80)
+    logger.info("CALLING CHATGPT API (STREAMING)")
+    logger.info("=" * 80)
+
+    try:
+        stream = create_chat_completion(
+            openai_client,
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a music recommendation expert. Always return valid JSON.",
+                },
+                {"role": "user", "content": chatgpt_prompt},
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+
+        buffer = ""
+        position = 0
+        count = 0
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            buffer += chunk.choices[0].delta.content
+
+            recommendations, position = parse_streamed_recommendations(buffer, position)
+            for rec in recommendations:
+                count += 1
+                logger.info("   %s. %s - %s", count, rec["song"], rec["artist"])
+                yield rec
+
+        logger.info("Streamed %s recommendations", count)
+
+    except (CircuitOpenError, openai.APIError):
+        raise
+    except Exception as e:
+        logger.error("Error calling ChatGPT: %s", e)
+
+
 def analyze_and_recommend(
     openai_client: OpenAI,
     playlist_data: Dict[str, Any],
@@ -197,3 +561,42 @@ def analyze_and_recommend(
     )
 
     return gpt_recommendations
+
+
+def stream_analyze_and_recommend(
+    openai_client: OpenAI,
+    playlist_data: Dict[str, Any],
+    reddit_data: List[Dict[str, Any]],
+    top_tracks: List[Dict[str, Any]],
+    subreddit_name: str,
+    num_recommendations: int = 5,
+    model: str = "gpt-4",
+    temperature: float = 0.7,
+    max_tokens: int = 500,
+) -> Iterator[Dict[str, str]]:
+    """
+    Combined Steps 4 & 5 (Streaming): Format data and stream ChatGPT recommendations
+
+    Args:
+        openai_client: OpenAI client object
+        playlist_data: Dictionary with playlist information
+        reddit_data: List of Reddit posts and comments
+        top_tracks: List of top tracks
+        subreddit_name: Name of subreddit
+        num_recommendations: Number of recommendations to request
+        model: GPT model to use
+        temperature: Temperature parameter
+        max_tokens: Maximum tokens for response
+
+    Yields:
+        dict: Song recommendation with 'song' and 'artist' keys
+    """
+    # Step 4: Format data
+    chatgpt_prompt = format_data_for_chatgpt(
+        playlist_data, reddit_data, top_tracks, subreddit_name, num_recommendations
+    )
+
+    # Step 5: Stream recommendations
+    yield from stream_chatgpt_recommendations(
+        openai_client, chatgpt_prompt, model, temperature, max_tokens
+    )
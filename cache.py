@@ -0,0 +1,61 @@
+"""
+Cache Module
+Small in-memory TTL cache shared by the API and Reddit layers
+(lives per worker process, so it resets on every cold start)
+"""
+
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    In-memory key/value cache where every entry expires after a fixed time
+
+    Args:
+        ttl: Seconds an entry stays valid after it is set
+        max_size: Maximum number of entries kept (oldest is evicted first)
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._store: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing/expired"""
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            # Expired, drop it so it doesn't count toward max_size
+            self._store.pop(key, None)
+            return None
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key (ttl overrides the cache default for this entry)"""
+        # Re-insert so dict order stays oldest -> newest
+        self._store.pop(key, None)
+        if len(self._store) >= self.max_size:
+            oldest_key = next(iter(self._store))
+            self._store.pop(oldest_key, None)
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._store[key] = (expires_at, value)
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove key from the cache, returns True if it was present"""
+        return self._store.pop(key, None) is not None
+
+    def clear(self) -> int:
+        """Remove every entry, returns how many were removed"""
+        count = len(self._store)
+        self._store.clear()
+        return count
+
+    def __len__(self) -> int:
+        return len(self._store)
@@ -0,0 +1,83 @@
+"""
+Circuit Breaker Module
+Stops calling an upstream API (Spotify, Reddit, OpenAI) after repeated failures
+so a sick service fails requests fast instead of tying up every worker
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Circuit Breaker Configuration
+DEFAULT_FAIL_MAX: int = 5  # consecutive failures before the circuit opens
+DEFAULT_RESET_TIMEOUT: float = 60.0  # seconds to stay open before letting calls through again (long enough for a blip to clear)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is blocked because the upstream's circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Track consecutive failures for one upstream and block calls while it is failing
+
+    After `fail_max` consecutive failures the circuit opens and `check()` raises
+    CircuitOpenError for `reset_timeout` seconds. After that calls are let through
+    again, one success closes the circuit and another failure re-opens it.
+
+    Args:
+        name: Upstream name used in logs and errors
+        fail_max: Consecutive failures before the circuit opens
+        reset_timeout: Seconds to stay open before letting calls through again
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fail_max: int = DEFAULT_FAIL_MAX,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being blocked"""
+        with self._lock:
+            return (
+                self._opened_at is not None
+                and time.monotonic() - self._opened_at < self.reset_timeout
+            )
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if calls to this upstream are currently blocked"""
+        if self.is_open:
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+    def record_success(self) -> None:
+        """Reset the failure count and close the circuit"""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.warning("%s circuit closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit once fail_max is reached"""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.fail_max:
+                if self._opened_at is None:
+                    logger.warning(
+                        "%s circuit opened after %s consecutive failures",
+                        self.name,
+                        self._failures,
+                    )
+                # Also restarts the timer when a trial call fails
+                self._opened_at = time.monotonic()
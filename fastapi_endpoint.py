@@ -3,26 +3,157 @@ FastAPI for Song Recommendation System
 Receives playlist url from website and returns song recommendations as JSON
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+import os
+import openai
+import orjson
+import secrets
+from collections import Counter
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
-from main import get_recommendations
+from main import (
+    EmptyPlaylistError,
+    get_recommendations,
+    stream_recommendations,
+    gpt_batcher,
+)
+from reddit_api import close_reddit_client
+from spotify_api import get_playlist_id
 from spotipy.exceptions import SpotifyException
+from circuit_breaker import CircuitOpenError
+from cache import TTLCache
+
+# Logging Configuration
+# pipeline step-by-step logs are INFO (set LOG_LEVEL=INFO to see them, WARNING keeps the logs to problems only)
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "WARNING")
+
+logging.basicConfig(
+    level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Response Cache Configuration
+RESPONSE_CACHE_TTL: int = 3600  # seconds to keep a playlist's recommendations (playlists don't change much and the full pipeline is slow + costs GPT tokens)
+RESPONSE_CACHE_MAX_SIZE: int = 256  # max playlists cached per worker
+
+response_cache = TTLCache(ttl=RESPONSE_CACHE_TTL, max_size=RESPONSE_CACHE_MAX_SIZE)
+
+# token required to call /api/cache/invalidate (the endpoint is disabled when unset, clearing the cache forces paid GPT calls)
+CACHE_ADMIN_TOKEN: str | None = os.getenv("CACHE_ADMIN_TOKEN")
+
+# Cache Primer Configuration
+# the primer refreshes the most requested playlists in the background so their requests always hit the cache
+# off by default, every refresh is a full paid pipeline run and each gunicorn worker primes its own cache
+CACHE_PRIMER_ENABLED: bool = (
+    os.getenv("CACHE_PRIMER_ENABLED", "false").lower() == "true"
+)
+CACHE_PRIMER_INTERVAL: int = 1800  # seconds between refreshes (30 min)
+CACHE_PRIMER_TOP_K: int = 10  # how many of the most requested playlists to keep warm
+# primed entries outlive one refresh interval so they never expire before the next run
+CACHE_PRIMER_TTL: int = RESPONSE_CACHE_TTL + CACHE_PRIMER_INTERVAL
+CACHE_PRIMER_MAX_TRACKED: int = 1024  # max playlists counted per worker (the least requested half is dropped when full)
+
+# request counts per playlist ID since the last primer run, used to pick what it refreshes
+playlist_request_counts = Counter()
+
+# CORS Configuration
+# comma separated list of allowed browser origins (set CORS_ORIGINS to add e.g. http://localhost:3000 for local frontend dev)
+CORS_ORIGINS: list = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS", "https://redditjams.com,https://www.redditjams.com"
+    ).split(",")
+    if origin.strip()
+]
+CORS_MAX_AGE: int = 86400  # seconds browsers can cache a preflight response (a day, so repeat calls skip the OPTIONS round trip)
+
+
+def record_playlist_request(cache_key: str) -> None:
+    """Count a request for a playlist so the primer knows what's popular"""
+    playlist_request_counts[cache_key] += 1
+
+    # Keep memory bounded, dropping the least requested playlists
+    if len(playlist_request_counts) > CACHE_PRIMER_MAX_TRACKED:
+        keep = playlist_request_counts.most_common(CACHE_PRIMER_MAX_TRACKED // 2)
+        playlist_request_counts.clear()
+        playlist_request_counts.update(dict(keep))
+
+
+async def prime_popular_playlists() -> int:
+    """
+    Recompute and cache recommendations for the most requested playlists since the last run
+
+    Returns:
+        Number of playlists refreshed
+    """
+    # Start counting from zero again so playlists nobody asks for anymore stop being refreshed
+    popular_playlists = playlist_request_counts.most_common(CACHE_PRIMER_TOP_K)
+    playlist_request_counts.clear()
+
+    primed = 0
+    for cache_key, _ in popular_playlists:
+        playlist_url = f"https://open.spotify.com/playlist/{cache_key}"
+        try:
+            result = await get_recommendations(playlist_url=playlist_url)
+        except Exception as e:
+            logger.warning("Cache primer failed for %s: %s", cache_key, e)
+            continue
+
+        # Same rule as requests, never cache partial/empty results
+        if is_cacheable(result):
+            response_cache.set(cache_key, build_response(result), ttl=CACHE_PRIMER_TTL)
+            primed += 1
+
+    logger.info("Cache primer refreshed %s playlists", primed)
+    return primed
+
+
+async def run_cache_primer() -> None:
+    """Refresh the popular playlists every CACHE_PRIMER_INTERVAL seconds until cancelled"""
+    while True:
+        await asyncio.sleep(CACHE_PRIMER_INTERVAL)
+        await prime_popular_playlists()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the cache primer and clean up the worker's shared clients on shutdown"""
+    primer_task = None
+    if CACHE_PRIMER_ENABLED:
+        primer_task = asyncio.create_task(run_cache_primer())
+
+    yield
+
+    if primer_task is not None:
+        primer_task.cancel()
+        try:
+            await primer_task
+        except asyncio.CancelledError:
+            pass
+    await close_reddit_client()
+    await gpt_batcher.close()
+
 
 app = FastAPI(
     title="RedditJams API",
     description="Song Recommendation API based on Spotify playlists and Reddit recommendations",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Enable CORS
+# Enable CORS (only the website can call the API from a browser)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    max_age=CORS_MAX_AGE,
 )
 
 
@@ -38,6 +169,65 @@ class RecommendationResponse(BaseModel):
     error: Optional[str] = None
 
 
+class CacheInvalidateRequest(BaseModel):
+    playlist_url: Optional[str] = None
+
+
+def get_cache_key(playlist_url: str) -> str:
+    """Normalize a playlist URL to its playlist ID so share links (?si=...) hit the same entry"""
+    return get_playlist_id(playlist_url)
+
+
+def get_spotify_error(e: SpotifyException) -> str:
+    """Map a Spotify API error to a user facing error message"""
+    error_message = str(e)
+
+    # Check for invalid playlist ID (400) - malformed URL
+    if "http status: 400" in error_message or "Invalid base62 id" in error_message:
+        return "Invalid playlist URL. Please check the link and try again."
+    # Check for private/not found playlist (404)
+    elif "http status: 404" in error_message or "Resource not found" in error_message:
+        return "Playlist not found. It may be private or deleted. Please make sure the playlist exists and is public."
+    else:
+        # Any other Spotify error - internal error
+        return "Internal error. Please try again later."
+
+
+def build_response(result: dict) -> RecommendationResponse:
+    """Build the API response from a get_recommendations result"""
+    return RecommendationResponse(
+        success=True,
+        playlist_details={
+            "name": result["playlist_data"]["name"],
+            "owner": result["playlist_data"]["owner"],
+            "total_tracks": result["playlist_data"]["total_tracks"],
+            "album_art": result["playlist_data"]["album_art"],
+        },
+        recommendations=result["final_recommendations"],
+        metadata={
+            "total_tracks_analyzed": len(result["tracks_data"]),
+            "reddit_posts_found": len(result["reddit_data"]),
+            "recommendations_requested": result["metadata"]["num_requested"],
+            "recommendations_found": result["metadata"]["num_found"],
+            "degraded": result["metadata"]["degraded"],
+        },
+    )
+
+
+def is_cacheable(result: dict) -> bool:
+    """True if a get_recommendations result is complete enough to serve from the cache"""
+    # An empty or degraded result usually means an upstream blipped, retry it next time
+    return bool(result["final_recommendations"]) and not result["metadata"]["degraded"]
+
+
+EMPTY_PLAYLIST_ERROR = (
+    "This playlist has no tracks to analyze. Please add some songs and try again."
+)
+UNAVAILABLE_ERROR = (
+    "A music service is temporarily unavailable. Please try again in a minute."
+)
+
+
 @app.post("/api/recommendations", response_model=RecommendationResponse)
 async def get_song_recommendations(request: RecommendationRequest):
     """
@@ -52,59 +242,118 @@ async def get_song_recommendations(request: RecommendationRequest):
             error="Invalid playlist URL. Please provide a valid Spotify playlist link that starts with 'https://open.spotify.com/playlist/'",
         )
 
+    # Return cached recommendations for this playlist if we have them
+    cache_key = get_cache_key(request.playlist_url)
+    record_playlist_request(cache_key)
+    cached_response = response_cache.get(cache_key)
+    if cached_response is not None:
+        return cached_response
+
     try:
         # Call main recommendation function (async)
         result = await get_recommendations(playlist_url=request.playlist_url)
 
         # Prepare response
-        return RecommendationResponse(
-            success=True,
-            playlist_details={
-                "name": result["playlist_data"]["name"],
-                "owner": result["playlist_data"]["owner"],
-                "total_tracks": result["playlist_data"]["total_tracks"],
-                "album_art": result["playlist_data"]["album_art"],
-            },
-            recommendations=result["final_recommendations"],
-            metadata={
-                "total_tracks_analyzed": len(result["tracks_data"]),
-                "reddit_posts_found": len(result["reddit_data"]),
-                "recommendations_requested": result["metadata"]["num_requested"],
-                "recommendations_found": result["metadata"]["num_found"],
-            },
-        )
+        response = build_response(result)
+
+        # Only complete successful responses are cached so errors/partial results get retried
+        if is_cacheable(result):
+            response_cache.set(cache_key, response)
+        return response
+
+    except EmptyPlaylistError:
+        return RecommendationResponse(success=False, error=EMPTY_PLAYLIST_ERROR)
+
+    except (CircuitOpenError, openai.APIError):
+        # An upstream API is down, report it instead of an empty list of recommendations
+        return RecommendationResponse(success=False, error=UNAVAILABLE_ERROR)
 
     except SpotifyException as e:
         # Handle Spotify API errors consistently
-        error_message = str(e)
-
-        # Check for invalid playlist ID (400) - malformed URL
-        if "http status: 400" in error_message or "Invalid base62 id" in error_message:
-            return RecommendationResponse(
-                success=False,
-                error="Invalid playlist URL. Please check the link and try again.",
-            )
-        # Check for private/not found playlist (404)
-        elif (
-            "http status: 404" in error_message or "Resource not found" in error_message
-        ):
-            return RecommendationResponse(
-                success=False,
-                error="Playlist not found. It may be private or deleted. Please make sure the playlist exists and is public.",
-            )
-        else:
-            # Any other Spotify error - internal error
-            return RecommendationResponse(
-                success=False, error="Internal error. Please try again later."
-            )
+        return RecommendationResponse(success=False, error=get_spotify_error(e))
 
-    except Exception as e:
+    except Exception:
         # Generic error handler - internal error
+        logger.exception("Unexpected error getting recommendations")
         return RecommendationResponse(
             success=False, error="Internal error. Please try again later."
         )
 
 
+@app.post("/api/recommendations/stream")
+async def stream_song_recommendations(request: RecommendationRequest):
+    """
+    Stream song recommendations as newline delimited JSON (one event per line)
+
+    - **playlist_url**: Spotify playlist URL (required)
+
+    Events are {"type": "playlist" | "recommendation" | "done" | "error", ...}
+    """
+
+    def encode(event: dict) -> bytes:
+        # One JSON object per line (orjson encodes straight to bytes)
+        return orjson.dumps(event) + b"\n"
+
+    async def generate():
+        # Validate that the URL starts with the correct Spotify playlist URL format
+        if not request.playlist_url.startswith("https://open.spotify.com/playlist/"):
+            yield encode(
+                {
+                    "type": "error",
+                    "error": "Invalid playlist URL. Please provide a valid Spotify playlist link that starts with 'https://open.spotify.com/playlist/'",
+                }
+            )
+            return
+
+        try:
+            async for event in stream_recommendations(request.playlist_url):
+                yield encode(event)
+
+        except EmptyPlaylistError:
+            yield encode({"type": "error", "error": EMPTY_PLAYLIST_ERROR})
+
+        except (CircuitOpenError, openai.APIError):
+            yield encode({"type": "error", "error": UNAVAILABLE_ERROR})
+
+        except SpotifyException as e:
+            yield encode({"type": "error", "error": get_spotify_error(e)})
+
+        except Exception:
+            logger.exception("Unexpected error streaming recommendations")
+            yield encode(
+                {"type": "error", "error": "Internal error. Please try again later."}
+            )
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.post("/api/cache/invalidate")
+async def invalidate_cache(
+    request: CacheInvalidateRequest, x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Drop cached recommendations (admin only)
+
+    - **playlist_url**: Spotify playlist URL to invalidate (optional, clears everything if omitted)
+    - **X-Admin-Token**: header that must match the CACHE_ADMIN_TOKEN env variable
+    """
+    if not CACHE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(
+        x_admin_token, CACHE_ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+    if request.playlist_url:
+        if not request.playlist_url.startswith("https://open.spotify.com/playlist/"):
+            raise HTTPException(status_code=400, detail="Invalid playlist URL")
+        removed = int(response_cache.delete(get_cache_key(request.playlist_url)))
+    else:
+        removed = response_cache.clear()
+
+    return {"success": True, "invalidated": removed}
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -125,4 +374,5 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
 
+    # Local development server, for production use gunicorn (see gunicorn.conf.py)
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,18 @@
+"""
+Gunicorn Configuration
+Production server settings for self-hosting the FastAPI app (Vercel doesn't use this)
+Run with: gunicorn fastapi_endpoint:app
+"""
+
+import multiprocessing
+import os
+
+# Server Configuration
+bind: str = os.getenv("BIND", "0.0.0.0:8000")  # address to listen on
+workers: int = (
+    int(os.getenv("WEB_CONCURRENCY", 0)) or multiprocessing.cpu_count() * 2 + 1
+)  # worker processes (2n+1 is the usual starting point, WEB_CONCURRENCY overrides it)
+worker_class: str = "uvicorn.workers.UvicornWorker"  # async workers, uvicorn[standard] picks uvloop + httptools automatically
+timeout: int = 300  # seconds before a silent worker is killed (the full pipeline can take minutes with GPT + reddit)
+graceful_timeout: int = 30  # seconds to finish in-flight requests on restart
+keepalive: int = 5  # seconds to hold idle keep-alive connections
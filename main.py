@@ -3,16 +3,29 @@ Main Orchestrator
 Coordinates all steps of the recommendation system and displays results (Step 7)
 """
 
+import logging
 import os
 import asyncio
+import threading
+import spotipy
+from openai import OpenAI
 from dotenv import load_dotenv
 from spotify_api import (
     initialize_spotify,
     get_playlist_data,
+    search_spotify_song,
     search_spotify_recommendations,
 )
 from reddit_api import get_reddit_recommendations
-from ai_analysis import initialize_openai, analyze_and_recommend
+from ai_analysis import (
+    ChatGPTBatcher,
+    initialize_openai,
+    format_data_for_chatgpt,
+    stream_analyze_and_recommend,
+)
+from typing import Any, AsyncIterator, Dict
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -27,10 +40,16 @@ REDDIT_PASSWORD: str | None = os.getenv("REDDIT_PASSWORD")
 REDDIT_USER_AGENT: str | None = os.getenv("REDDIT_USER_AGENT")
 OPENAI_API_KEY: str | None = os.getenv("OPENAI_API_KEY")
 
+# Timeout Configuration (a hung upstream shouldn't hold a worker for minutes)
+SPOTIFY_TIMEOUT: float = 5  # seconds per spotify request
+OPENAI_TIMEOUT: float = 30  # seconds per chatgpt request (a full 500 token response normally takes well under this, the openai default is 10 minutes)
+
 # GPT Model Configuration
 GPT_MODEL: str = "gpt-4o-mini"  # model
 GPT_TEMPERATURE: float = 0.7  # creativity level (thi is complicated curr 0.7 is working well but too high and you're not utilizing reddit data enough too low and you're trusting gpt too much)
 GPT_MAX_TOKENS: int = 500  # max tokens for response (500 should be sufficient for recommendations this is output length not input length)
+GPT_BATCH_WINDOW: float = 0.05  # seconds to wait for other concurrent requests to share a ChatGPT call with (short enough to not be noticeable)
+GPT_MAX_BATCH_SIZE: int = 4  # max requests merged into one ChatGPT call (more than this and the merged prompt gets too long to answer well)
 
 # Reddit Configuration
 SUBREDDIT_NAME: str = "music"  # subreddit to search for recommendations (this is the obvious default beacuse its far popular than any other music related subreddit)
@@ -46,49 +65,67 @@ NUM_BOTTOM_ARTISTS: int = 2  # number of bottom artists to analyze
 NUM_RANDOM_ARTISTS: int = 2  # number of random artists to analyze
 NUM_RECOMMENDATIONS: int = 5  # number of recommendations to generate
 
+# Shared per worker so concurrent requests can be batched into one ChatGPT call
+gpt_batcher = ChatGPTBatcher(
+    GPT_MODEL, GPT_TEMPERATURE, GPT_MAX_TOKENS, GPT_BATCH_WINDOW, GPT_MAX_BATCH_SIZE
+)
 
-async def get_recommendations(playlist_url: str) -> dict:
+
+class EmptyPlaylistError(Exception):
+    """Raised when a playlist has no tracks to base recommendations on"""
+
+
+# Shared API clients for this worker (created on the first request, reused after)
+_sp_client: spotipy.Spotify | None = None
+_openai_client: OpenAI | None = None
+_sp_client_lock = threading.Lock()
+_openai_client_lock = threading.Lock()
+
+
+def get_spotify_client() -> spotipy.Spotify:
+    """Get the shared Spotify client (spotipy refreshes its access token when it expires)"""
+    global _sp_client
+    with _sp_client_lock:
+        if _sp_client is None:
+            _sp_client = initialize_spotify(
+                SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_TIMEOUT
+            )
+    return _sp_client
+
+
+def get_openai_client() -> OpenAI:
+    """Get the shared OpenAI client"""
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is None:
+            _openai_client = initialize_openai(OPENAI_API_KEY, OPENAI_TIMEOUT)
+    return _openai_client
+
+
+async def gather_pipeline_inputs(playlist_url: str) -> Dict[str, Any]:
     """
-    Main function to get song recommendations (Async)
+    Steps 1-3: Initialize APIs, extract playlist data and search Reddit (Async)
 
     Args:
-        playlist_url: Spotify playlist URL (REQUIRED)
+        playlist_url: Spotify playlist URL
 
     Returns:
-        dict: Contains final recommendations and metadata
+        dict: API clients, playlist data, tracks data and Reddit data
     """
-
-    print("=" * 80)
-    print("SONG RECOMMENDATION SYSTEM")
-    print("=" * 80)
-    print(f"\nConfiguration:")
-    print(f"  Playlist URL: {playlist_url}")
-    print(f"  Subreddit: r/{SUBREDDIT_NAME}")
-    print(f"  Max Reddit posts per query: {MAX_REDDIT_POSTS_PER_QUERY}")
-    print(f"  Max comments per post: {MAX_COMMENTS_PER_POST}")
-    print(
-        f"  Top tracks: {NUM_TOP_TRACKS}, Bottom tracks: {NUM_BOTTOM_TRACKS}, Random tracks: {NUM_RANDOM_TRACKS}"
-    )
-    print(
-        f"  Top artists: {NUM_TOP_ARTISTS}, Bottom artists: {NUM_BOTTOM_ARTISTS}, Random artists: {NUM_RANDOM_ARTISTS}"
+    # Initialize APIs (in parallel, Reddit is initialized inside its own async context)
+    logger.info("Initializing APIs...")
+    sp, openai_client = await asyncio.gather(
+        asyncio.to_thread(get_spotify_client), asyncio.to_thread(get_openai_client)
     )
-    print(f"  GPT Model: {GPT_MODEL}")
-    print(f"  GPT Temperature: {GPT_TEMPERATURE}")
-    print(f"  GPT Max Tokens: {GPT_MAX_TOKENS}")
-    print(f"  Recommendations to generate: {NUM_RECOMMENDATIONS}")
-    print("=" * 80)
-
-    # Initialize APIs
-    print("\nInitializing APIs...")
-    sp = initialize_spotify(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
-    openai_client = initialize_openai(OPENAI_API_KEY)
-    print()
-
-    # Step 2: Extract Playlist Data
-    playlist_result = get_playlist_data(sp, playlist_url)
+
+    # Step 2: Extract Playlist Data (blocking spotipy call, run off the event loop)
+    playlist_result = await asyncio.to_thread(get_playlist_data, sp, playlist_url)
     playlist_data = playlist_result["playlist_info"]
     tracks_data = playlist_result["tracks_data"]
-    print()
+
+    # Nothing to analyze, stop before spending Reddit searches and a ChatGPT call
+    if not tracks_data:
+        raise EmptyPlaylistError(f"Playlist '{playlist_data['name']}' has no tracks")
 
     # Step 3: Search Reddit for Recommendations (Async)
     reddit_result = await get_reddit_recommendations(
@@ -111,48 +148,100 @@ async def get_recommendations(playlist_url: str) -> dict:
     all_reddit_data = reddit_result["all_reddit_data"]
     top_tracks = reddit_result["top_tracks"]
     all_artists = reddit_result["all_artists"]
-    print()
 
-    # Steps 4 & 5: Format Data and Get ChatGPT Recommendations
-    gpt_recommendations = analyze_and_recommend(
-        openai_client,
-        playlist_data,
-        all_reddit_data,
-        top_tracks,
-        SUBREDDIT_NAME,
-        NUM_RECOMMENDATIONS,
-        GPT_MODEL,
-        GPT_TEMPERATURE,
-        GPT_MAX_TOKENS,
+    return {
+        "sp": sp,
+        "openai_client": openai_client,
+        "playlist_data": playlist_data,
+        "tracks_data": tracks_data,
+        "all_reddit_data": all_reddit_data,
+        "top_tracks": top_tracks,
+        "all_artists": all_artists,
+        "degraded": reddit_result["degraded"],
+    }
+
+
+async def get_recommendations(playlist_url: str) -> dict:
+    """
+    Main function to get song recommendations (Async)
+
+    Args:
+        playlist_url: Spotify playlist URL (REQUIRED)
+
+    Returns:
+        dict: Contains final recommendations and metadata
+    """
+
+    logger.info("=" * 80)
+    logger.info("SONG RECOMMENDATION SYSTEM")
+    logger.info("=" * 80)
+    logger.info("Configuration:")
+    logger.info("  Playlist URL: %s", playlist_url)
+    logger.info("  Subreddit: r/%s", SUBREDDIT_NAME)
+    logger.info("  Max Reddit posts per query: %s", MAX_REDDIT_POSTS_PER_QUERY)
+    logger.info("  Max comments per post: %s", MAX_COMMENTS_PER_POST)
+    logger.info(
+        "  Top tracks: %s, Bottom tracks: %s, Random tracks: %s",
+        NUM_TOP_TRACKS,
+        NUM_BOTTOM_TRACKS,
+        NUM_RANDOM_TRACKS,
+    )
+    logger.info(
+        "  Top artists: %s, Bottom artists: %s, Random artists: %s",
+        NUM_TOP_ARTISTS,
+        NUM_BOTTOM_ARTISTS,
+        NUM_RANDOM_ARTISTS,
     )
-    print()
+    logger.info("  GPT Model: %s", GPT_MODEL)
+    logger.info("  GPT Temperature: %s", GPT_TEMPERATURE)
+    logger.info("  GPT Max Tokens: %s", GPT_MAX_TOKENS)
+    logger.info("  Recommendations to generate: %s", NUM_RECOMMENDATIONS)
+    logger.info("=" * 80)
 
-    # Step 6: Search Spotify for Recommended Songs
-    final_recommendations = search_spotify_recommendations(sp, gpt_recommendations)
-    print()
+    # Steps 1-3: Initialize APIs, extract playlist data and search Reddit
+    inputs = await gather_pipeline_inputs(playlist_url)
+    sp = inputs["sp"]
+    openai_client = inputs["openai_client"]
+    playlist_data = inputs["playlist_data"]
+    tracks_data = inputs["tracks_data"]
+    all_reddit_data = inputs["all_reddit_data"]
+    top_tracks = inputs["top_tracks"]
+    all_artists = inputs["all_artists"]
 
-    print("\n" + "=" * 80)
-    print("FINAL SONG RECOMMENDATIONS")
-    print("=" * 80)
+    # Step 4: Format Data for ChatGPT
+    chatgpt_prompt = format_data_for_chatgpt(
+        playlist_data, all_reddit_data, top_tracks, SUBREDDIT_NAME, NUM_RECOMMENDATIONS
+    )
+
+    # Step 5: Get ChatGPT Recommendations (batched with any concurrent requests)
+    gpt_recommendations = await gpt_batcher.submit(openai_client, chatgpt_prompt)
+
+    # Step 6: Search Spotify for Recommended Songs (Async)
+    spotify_result = await search_spotify_recommendations(sp, gpt_recommendations)
+    final_recommendations = spotify_result["final_recommendations"]
+
+    logger.info("=" * 80)
+    logger.info("FINAL SONG RECOMMENDATIONS")
+    logger.info("=" * 80)
 
     if final_recommendations:
         for idx, track in enumerate(final_recommendations, 1):
-            print(f"\n{idx}. {track['name']}")
-            print(f"   Artist: {track['artist']}")
-            print(f"   Album: {track['album']}")
-            print(f"   Release: {track['release_date']}")
-            print(f"   Duration: {track['duration_readable']}")
-            print(f"   Popularity: {track['popularity']}/100")
-            print(f"   Listen: {track['external_url']}")
+            logger.info("%s. %s", idx, track["name"])
+            logger.info("   Artist: %s", track["artist"])
+            logger.info("   Album: %s", track["album"])
+            logger.info("   Release: %s", track["release_date"])
+            logger.info("   Duration: %s", track["duration_readable"])
+            logger.info("   Popularity: %s/100", track["popularity"])
+            logger.info("   Listen: %s", track["external_url"])
             if track["album_art"]:
-                print(f"   Album Art: {track['album_art']}")
+                logger.info("   Album Art: %s", track["album_art"])
             if track["preview_url"]:
-                print(f"   Preview: {track['preview_url']}")
-            print(f"   URI: {track['uri']}")
+                logger.info("   Preview: %s", track["preview_url"])
+            logger.info("   URI: %s", track["uri"])
     else:
-        print("No recommendations found.")
+        logger.info("No recommendations found.")
 
-    print("\n" + "=" * 80)
+    logger.info("=" * 80)
 
     # Return structured data
     return {
@@ -167,5 +256,81 @@ async def get_recommendations(playlist_url: str) -> dict:
             "subreddit": SUBREDDIT_NAME,
             "num_requested": NUM_RECOMMENDATIONS,
             "num_found": len(final_recommendations),
+            "degraded": inputs["degraded"] or spotify_result["degraded"],
+        },
+    }
+
+
+async def stream_recommendations(playlist_url: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming version of get_recommendations (Async)
+    Yields each recommendation as soon as ChatGPT finishes it and Spotify finds it
+
+    Args:
+        playlist_url: Spotify playlist URL (REQUIRED)
+
+    Yields:
+        dict: Events, in order:
+            {"type": "playlist", "playlist_details": ...}
+            {"type": "recommendation", "recommendation": ...} (one per track found)
+            {"type": "done", "metadata": ...}
+    """
+    # Steps 1-3: Initialize APIs, extract playlist data and search Reddit
+    inputs = await gather_pipeline_inputs(playlist_url)
+    playlist_data = inputs["playlist_data"]
+
+    yield {
+        "type": "playlist",
+        "playlist_details": {
+            "name": playlist_data["name"],
+            "owner": playlist_data["owner"],
+            "total_tracks": playlist_data["total_tracks"],
+            "album_art": playlist_data["album_art"],
+        },
+    }
+
+    # Steps 4 & 5: Stream ChatGPT recommendations (blocking iterator, step it off the event loop)
+    gpt_stream = stream_analyze_and_recommend(
+        inputs["openai_client"],
+        playlist_data,
+        inputs["all_reddit_data"],
+        inputs["top_tracks"],
+        SUBREDDIT_NAME,
+        NUM_RECOMMENDATIONS,
+        GPT_MODEL,
+        GPT_TEMPERATURE,
+        GPT_MAX_TOKENS,
+    )
+
+    # Step 6: Search Spotify for each recommendation as it arrives
+    num_found = 0
+    degraded = inputs["degraded"]
+    while True:
+        rec = await asyncio.to_thread(next, gpt_stream, None)
+        if rec is None:
+            break
+
+        try:
+            spotify_track = await asyncio.to_thread(
+                search_spotify_song, inputs["sp"], rec["song"], rec["artist"]
+            )
+        except Exception as e:
+            # Skip this one and keep streaming, the rest may still be found
+            logger.warning("Spotify search failed for '%s': %s", rec["song"], e)
+            degraded = True
+            continue
+
+        if spotify_track:
+            num_found += 1
+            yield {"type": "recommendation", "recommendation": spotify_track}
+
+    yield {
+        "type": "done",
+        "metadata": {
+            "total_tracks_analyzed": len(inputs["tracks_data"]),
+            "reddit_posts_found": len(inputs["all_reddit_data"]),
+            "recommendations_requested": NUM_RECOMMENDATIONS,
+            "recommendations_found": num_found,
+            "degraded": degraded,
         },
     }
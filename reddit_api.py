@@ -4,13 +4,90 @@ Handles Reddit authentication and operations:
 - Step 3: Search Reddit for recommendations (Async with parallel searches)
 """
 
+import logging
 import asyncpraw
 import asyncio
-from typing import Dict, List, Any
+import heapq
+import re
+from itertools import islice
+from asyncprawcore.exceptions import TooManyRequests
+from typing import Dict, List, Any, Tuple
+from cache import TTLCache
+from circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Concurrency Configuration
+MAX_CONCURRENT_SEARCHES: int = 5  # max reddit searches in flight at once (reddit rate limits per client, going higher just gets us 429s)
+MAX_RATE_LIMIT_RETRIES: int = 3  # times to retry a search after a 429 before giving up on that query (reddit usually clears within a couple of seconds)
+MAX_RETRY_AFTER: float = 10.0  # longest retry-after we'll wait out, reddit asking for more means the query is given up on right away (a user is waiting on this request)
+DEFAULT_RETRY_AFTER: float = 2.0  # seconds to wait after a 429 when reddit doesn't send a retry-after header (short enough to not stall the request)
+
+REQUEST_TIMEOUT: int = 10  # seconds before a single reddit API request times out (asyncpraw's default is 16)
+
+# Stops calling Reddit for a while after repeated failed searches (cached queries are still served)
+reddit_breaker = CircuitBreaker("Reddit")
+
+# Keyword Configuration (a post/comment is kept if it contains any of these, case insensitive)
+POST_KEYWORDS: List[str] = [
+    "recommend",
+    "similar",
+    "if you like",
+    "check out",
+    "you might like",
+    "fans of",
+]
+COMMENT_KEYWORDS: List[str] = [
+    "recommend",
+    "similar",
+    "if you like",
+    "check out",
+    "you might like",
+    "try",
+]
+STRONG_KEYWORDS: List[str] = [
+    "recommend",
+    "similar",
+]  # posts with these are kept even if none of their comments matched
+
+
+def compile_keywords(keywords: List[str]) -> re.Pattern:
+    """Compile a keyword list into one case insensitive pattern (one regex pass instead of one scan per keyword)"""
+    return re.compile(
+        "|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE
+    )
+
+
+POST_KEYWORDS_PATTERN = compile_keywords(POST_KEYWORDS)
+COMMENT_KEYWORDS_PATTERN = compile_keywords(COMMENT_KEYWORDS)
+STRONG_KEYWORDS_PATTERN = compile_keywords(STRONG_KEYWORDS)
+
+# Search Cache Configuration
+SEARCH_CACHE_TTL: int = 86400  # seconds to keep a query's results (popular artists get searched for over and over, reddit threads don't change much in a day)
+SEARCH_CACHE_MAX_SIZE: int = 2048  # max cached queries per worker
+
+search_cache = TTLCache(ttl=SEARCH_CACHE_TTL, max_size=SEARCH_CACHE_MAX_SIZE)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query (lowercase, no punctuation, single spaces)"""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def get_search_cache_key(
+    query: str, subreddit_name: str, max_posts: int, max_comments: int
+) -> Tuple[str, str, int, int]:
+    """Build a cache key from the normalized query and search settings"""
+    return (subreddit_name.lower(), normalize_query(query), max_posts, max_comments)
 
 
 def initialize_reddit(
-    client_id: str, client_secret: str, username: str, password: str, user_agent: str
+    client_id: str,
+    client_secret: str,
+    username: str,
+    password: str,
+    user_agent: str,
+    timeout: int = REQUEST_TIMEOUT,
 ) -> asyncpraw.Reddit:
     """
     Initialize async Reddit API client
@@ -21,6 +98,7 @@ def initialize_reddit(
         username: Reddit username
         password: Reddit password
         user_agent: Reddit user agent
+        timeout: Seconds before a Reddit request times out
 
     Returns:
         Async Reddit client object
@@ -31,12 +109,73 @@ def initialize_reddit(
         username=username,
         password=password,
         user_agent=user_agent,
+        timeout=timeout,
     )
 
-    print(f"Async Reddit API initialized")
+    logger.info("Async Reddit API initialized")
     return reddit
 
 
+# Shared Reddit client for this worker, bound to the event loop it was created on
+_reddit_client: asyncpraw.Reddit | None = None
+_reddit_client_loop: asyncio.AbstractEventLoop | None = None
+# Bounds searches across every request sharing the client (reddit rate limits per client)
+_reddit_search_semaphore: asyncio.Semaphore | None = None
+
+
+def get_reddit_client(
+    client_id: str, client_secret: str, username: str, password: str, user_agent: str
+) -> asyncpraw.Reddit:
+    """
+    Get the shared async Reddit client, creating it on first use (Async context only)
+
+    Args:
+        client_id: Reddit client ID
+        client_secret: Reddit client secret
+        username: Reddit username
+        password: Reddit password
+        user_agent: Reddit user agent
+
+    Returns:
+        Async Reddit client object
+    """
+    global _reddit_client, _reddit_client_loop, _reddit_search_semaphore
+
+    # The client's HTTP session belongs to one event loop, make a new one if the loop changed
+    loop = asyncio.get_running_loop()
+    if _reddit_client is not None and _reddit_client_loop is not loop:
+        if _reddit_client_loop.is_running():
+            # Close it on its own loop, its session can't be used from this one
+            asyncio.run_coroutine_threadsafe(
+                _reddit_client.close(), _reddit_client_loop
+            )
+        else:
+            logger.warning(
+                "Dropping Reddit client from a stopped event loop without closing it"
+            )
+        _reddit_client = None
+
+    if _reddit_client is None:
+        _reddit_client = initialize_reddit(
+            client_id, client_secret, username, password, user_agent
+        )
+        _reddit_client_loop = loop
+        _reddit_search_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+    return _reddit_client
+
+
+async def close_reddit_client():
+    """Close the shared Reddit client (call on shutdown)"""
+    global _reddit_client, _reddit_client_loop, _reddit_search_semaphore
+
+    if _reddit_client is not None and _reddit_client_loop is asyncio.get_running_loop():
+        await _reddit_client.close()
+    _reddit_client = None
+    _reddit_client_loop = None
+    _reddit_search_semaphore = None
+
+
 async def search_reddit_for_recommendations(
     reddit: asyncpraw.Reddit,
     query: str,
@@ -57,9 +196,25 @@ async def search_reddit_for_recommendations(
 
     Returns:
         list: List of recommendation posts with comments
+
+    Raises:
+        CircuitOpenError: If Reddit has been failing and calls are blocked
+        TooManyRequests: If Reddit rate limited the search
+        Exception: Any other error from the search (recorded as a breaker failure)
     """
+    # Skip Reddit entirely if this query was searched recently
+    cache_key = get_search_cache_key(query, subreddit_name, max_posts, max_comments)
+    cached_recommendations = search_cache.get(cache_key)
+    if cached_recommendations is not None:
+        return cached_recommendations
+
+    # Fail fast if Reddit has been down (raises CircuitOpenError)
+    reddit_breaker.check()
+
     subreddit = await reddit.subreddit(subreddit_name)
     recommendations = []
+    # Set when a post's comments couldn't be loaded, the results are still returned but not cached
+    incomplete = False
 
     try:
         # Search for posts
@@ -67,18 +222,9 @@ async def search_reddit_for_recommendations(
 
         async for post in search_results:
             # Look for recommendation keywords in title or body
-            text = f"{post.title} {post.selftext}".lower()
-
-            if any(
-                keyword in text
-                for keyword in [
-                    "recommend",
-                    "similar",
-                    "if you like",
-                    "check out",
-                    "you might like",
-                    "fans of",
-                ]
+            # (short title first, the body is only scanned if the title has no match)
+            if POST_KEYWORDS_PATTERN.search(post.title) or POST_KEYWORDS_PATTERN.search(
+                post.selftext
             ):
                 post_data = {
                     "title": post.title,
@@ -88,51 +234,120 @@ async def search_reddit_for_recommendations(
                     "comments": [],
                 }
 
-                # Get comments
-                try:
-                    await post.comments.replace_more(limit=0)
-                    all_comments = post.comments.list()
-
-                    for comment in all_comments[:max_comments]:
-                        try:
-                            comment_text = comment.body.lower()
-                            if any(
-                                keyword in comment_text
-                                for keyword in [
-                                    "recommend",
-                                    "similar",
-                                    "if you like",
-                                    "check out",
-                                    "you might like",
-                                    "try",
-                                ]
-                            ):
-                                post_data["comments"].append(
-                                    {
-                                        "body": comment.body,
-                                        "score": comment.score,
-                                        "author": str(comment.author)
-                                        if comment.author
-                                        else "[deleted]",
-                                    }
-                                )
-                        except AttributeError:
-                            # Skip if comment doesn't have body attribute (e.g., MoreComments object)
-                            continue
-                except Exception as e:
-                    pass
-
-                if post_data["comments"] or any(
-                    keyword in text for keyword in ["recommend", "similar"]
+                # Get comments (a post without any isn't worth a load() request)
+                if post.num_comments:
+                    try:
+                        # Search results are lazy, the comment forest is only
+                        # populated once the submission itself is fetched
+                        await post.load()
+                        await post.comments.replace_more(limit=0)
+
+                        # Only walk the top-level comments we keep instead of flattening every reply
+                        for comment in islice(post.comments, max_comments):
+                            try:
+                                if COMMENT_KEYWORDS_PATTERN.search(comment.body):
+                                    post_data["comments"].append(
+                                        {
+                                            "body": comment.body,
+                                            "score": comment.score,
+                                            "author": str(comment.author)
+                                            if comment.author
+                                            else "[deleted]",
+                                        }
+                                    )
+                            except AttributeError:
+                                # Skip if comment doesn't have body attribute (e.g., MoreComments object)
+                                continue
+                    except TooManyRequests:
+                        # Back off and retry the whole search instead of caching it without comments
+                        raise
+                    except Exception as e:
+                        logger.warning(
+                            "   Error loading comments for '%s': %s", post.title, e
+                        )
+                        incomplete = True
+
+                if (
+                    post_data["comments"]
+                    or STRONG_KEYWORDS_PATTERN.search(post.title)
+                    or STRONG_KEYWORDS_PATTERN.search(post.selftext)
                 ):
                     recommendations.append(post_data)
 
+    except TooManyRequests:
+        # Let the caller back off and retry
+        raise
     except Exception as e:
-        print(f"   Error searching Reddit: {e}")
+        logger.error("   Error searching Reddit: %s", e)
+        reddit_breaker.record_failure()
+        # Let the caller know this search failed (an empty list would look like no posts matched)
+        raise
+    else:
+        # Only cache complete searches so errors get retried next time
+        if not incomplete:
+            search_cache.set(cache_key, recommendations)
+            reddit_breaker.record_success()
 
     return recommendations
 
 
+async def search_reddit_with_limit(
+    semaphore: asyncio.Semaphore,
+    reddit: asyncpraw.Reddit,
+    query: str,
+    subreddit_name: str,
+    max_posts: int = 20,
+    max_comments: int = 30,
+) -> List[Dict[str, Any]]:
+    """
+    Run a Reddit search under a shared semaphore, backing off on rate limits (Async)
+
+    Args:
+        semaphore: Semaphore bounding the number of concurrent searches
+        reddit: Async Reddit client object
+        query: Search query string
+        subreddit_name: Name of subreddit to search
+        max_posts: Maximum number of posts to retrieve
+        max_comments: Maximum number of comments per post
+
+    Returns:
+        list: List of recommendation posts with comments
+
+    Raises:
+        TooManyRequests: If Reddit is still rate limiting after MAX_RATE_LIMIT_RETRIES
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        async with semaphore:
+            try:
+                return await search_reddit_for_recommendations(
+                    reddit, query, subreddit_name, max_posts, max_comments
+                )
+            except TooManyRequests as e:
+                rate_limit_error = e
+                try:
+                    retry_after = float(e.retry_after)
+                except (TypeError, ValueError):
+                    retry_after = DEFAULT_RETRY_AFTER
+
+                if retry_after > MAX_RETRY_AFTER:
+                    logger.error(
+                        "   Reddit asked to wait %.1fs, giving up on '%s'",
+                        retry_after,
+                        query,
+                    )
+                    raise
+
+        # Sleep outside the semaphore so other searches can keep going
+        if attempt < MAX_RATE_LIMIT_RETRIES:
+            logger.warning(
+                "   Rate limited by Reddit, retrying in %.1fs...", retry_after
+            )
+            await asyncio.sleep(retry_after)
+
+    logger.error("   Giving up on '%s' after %s retries", query, MAX_RATE_LIMIT_RETRIES)
+    raise rate_limit_error
+
+
 async def get_reddit_recommendations(
     client_id: str,
     client_secret: str,
@@ -171,164 +386,205 @@ async def get_reddit_recommendations(
         num_random_artists: Number of random artists to select
 
     Returns:
-        dict: Contains all_reddit_data, selected_tracks, and selected_artists
+        dict: Contains all_reddit_data, selected_tracks, selected_artists and degraded
     """
-    print("=" * 80)
-    print("SEARCHING REDDIT FOR RECOMMENDATIONS (PARALLEL)")
-    print("=" * 80)
-
-    # Initialize Reddit client within async context
-    async with asyncpraw.Reddit(
-        client_id=client_id,
-        client_secret=client_secret,
-        username=username,
-        password=password,
-        user_agent=user_agent,
-    ) as reddit:
-        print("Async Reddit API initialized")
+    logger.info("=" * 80)
+    logger.info("SEARCHING REDDIT FOR RECOMMENDATIONS (PARALLEL)")
+    logger.info("=" * 80)
+
+    # Reuse this worker's Reddit client (authenticated once, not on every request)
+    reddit = get_reddit_client(client_id, client_secret, username, password, user_agent)
+
+    # Import random for random selection
+    import random
+
+    # Get diverse track selection: top, bottom, and random
+    # Check if playlist has enough tracks
+    total_tracks_needed = num_top_tracks + num_bottom_tracks + num_random_tracks
+    if len(tracks_data) < total_tracks_needed:
+        logger.warning(
+            "   Warning: Playlist has only %s tracks, need %s for diverse selection",
+            len(tracks_data),
+            total_tracks_needed,
+        )
+        logger.info("   Using available tracks...")
+        selected_tracks = sorted(
+            tracks_data, key=lambda x: x["popularity"], reverse=True
+        )
+    else:
+        # Top and bottom tracks (heaps only order the few we keep instead of sorting the whole playlist)
+        top_tracks = heapq.nlargest(
+            num_top_tracks, tracks_data, key=lambda x: x["popularity"]
+        )
+        # Bottom tracks come from the rest so tied popularities can't pick a top track twice
+        # (scanned in reverse so ties match the tail of a full descending sort)
+        picked = {id(track) for track in top_tracks}
+        bottom_tracks = heapq.nsmallest(
+            num_bottom_tracks,
+            (track for track in reversed(tracks_data) if id(track) not in picked),
+            key=lambda x: x["popularity"],
+        )
+        bottom_tracks.reverse()  # most popular first, same as the rest of the selection
+        # Random tracks (excluding top and bottom)
+        picked.update(id(track) for track in bottom_tracks)
+        middle_tracks = [track for track in tracks_data if id(track) not in picked]
+        if len(middle_tracks) >= num_random_tracks:
+            random_tracks = random.sample(middle_tracks, num_random_tracks)
+        else:
+            random_tracks = middle_tracks
 
-        # Import random for random selection
-        import random
+        selected_tracks = top_tracks + bottom_tracks + random_tracks
 
-        # Get diverse track selection: top, bottom, and random
-        sorted_tracks = sorted(tracks_data, key=lambda x: x["popularity"], reverse=True)
+    # Get diverse artist selection: top, bottom, and random
+    # dict.fromkeys dedups in playlist order (a set would shuffle it differently every run)
+    all_artists_list = list(
+        dict.fromkeys(artist for track in tracks_data for artist in track["artists"])
+    )
 
-        # Check if playlist has enough tracks
-        total_tracks_needed = num_top_tracks + num_bottom_tracks + num_random_tracks
-        if len(sorted_tracks) < total_tracks_needed:
-            print(
-                f"   Warning: Playlist has only {len(sorted_tracks)} tracks, need {total_tracks_needed} for diverse selection"
-            )
-            print(f"   Using available tracks...")
-            selected_tracks = sorted_tracks
-        else:
-            # Top tracks
-            top_tracks = sorted_tracks[:num_top_tracks]
-            # Bottom tracks
-            bottom_tracks = sorted_tracks[-num_bottom_tracks:]
-            # Random tracks (excluding top and bottom)
-            middle_tracks = sorted_tracks[
-                num_top_tracks : -num_bottom_tracks if num_bottom_tracks > 0 else None
-            ]
-            if len(middle_tracks) >= num_random_tracks:
-                random_tracks = random.sample(middle_tracks, num_random_tracks)
-            else:
-                random_tracks = middle_tracks
-
-            selected_tracks = top_tracks + bottom_tracks + random_tracks
-
-        # Get diverse artist selection: top, bottom, and random
-        all_artists_list = list(
-            set([artist for track in tracks_data for artist in track["artists"]])
+    total_artists_needed = num_top_artists + num_bottom_artists + num_random_artists
+    if len(all_artists_list) < total_artists_needed:
+        logger.warning(
+            "   Warning: Playlist has only %s unique artists, need %s for diverse selection",
+            len(all_artists_list),
+            total_artists_needed,
         )
-
-        total_artists_needed = num_top_artists + num_bottom_artists + num_random_artists
-        if len(all_artists_list) < total_artists_needed:
-            print(
-                f"   Warning: Playlist has only {len(all_artists_list)} unique artists, need {total_artists_needed} for diverse selection"
-            )
-            print(f"   Using available artists...")
-            selected_artists = all_artists_list
+        logger.info("   Using available artists...")
+        selected_artists = all_artists_list
+    else:
+        # For artists, we don't have popularity, so we'll use first, last, and random from the list
+        top_artists = all_artists_list[:num_top_artists]
+        bottom_artists = all_artists_list[-num_bottom_artists:]
+        middle_artists = all_artists_list[
+            num_top_artists : -num_bottom_artists if num_bottom_artists > 0 else None
+        ]
+        if len(middle_artists) >= num_random_artists:
+            random_artists = random.sample(middle_artists, num_random_artists)
         else:
-            # For artists, we don't have popularity, so we'll use first, last, and random from the list
-            top_artists = all_artists_list[:num_top_artists]
-            bottom_artists = all_artists_list[-num_bottom_artists:]
-            middle_artists = all_artists_list[
-                num_top_artists : -num_bottom_artists
-                if num_bottom_artists > 0
-                else None
-            ]
-            if len(middle_artists) >= num_random_artists:
-                random_artists = random.sample(middle_artists, num_random_artists)
-            else:
-                random_artists = middle_artists
-
-            selected_artists = top_artists + bottom_artists + random_artists
-
-        print(f"\nSearching for recommendations based on DIVERSE selection:")
-        print(
-            f"   - {len(selected_tracks)} tracks (top {num_top_tracks} + bottom {num_bottom_tracks} + random {num_random_tracks})"
-        )
-        print(
-            f"   - {len(selected_artists)} artists (top {num_top_artists} + bottom {num_bottom_artists} + random {num_random_artists})"
-        )
-        print(f"   - Running ALL searches in parallel...")
-        print()
-
-        # Create all search tasks for tracks
-        track_search_tasks = []
-        for idx, track in enumerate(selected_tracks, 1):
-            query = f"{track['name']} {track['artist_names']} recommend"
-            print(f"[Track {idx}/{len(selected_tracks)}] Queuing: '{track['name']}'")
-            task = search_reddit_for_recommendations(
-                reddit,
-                query,
-                subreddit_name,
-                max_reddit_posts_per_query,
-                max_comments_per_post,
-            )
-            track_search_tasks.append(task)
-
-        # Create all search tasks for artists
-        artist_search_tasks = []
-        for idx, artist in enumerate(selected_artists, 1):
-            query = f"{artist} recommend similar"
-            print(f"[Artist {idx}/{len(selected_artists)}] Queuing: '{artist}'")
-            task = search_reddit_for_recommendations(
-                reddit,
-                query,
-                subreddit_name,
-                max_reddit_posts_per_query,
-                max_comments_per_post,
-            )
-            artist_search_tasks.append(task)
+            random_artists = middle_artists
+
+        selected_artists = top_artists + bottom_artists + random_artists
 
-        print(
-            f"\nExecuting {len(track_search_tasks) + len(artist_search_tasks)} searches in parallel..."
+    logger.info("Searching for recommendations based on DIVERSE selection:")
+    logger.info(
+        "   - %s tracks (top %s + bottom %s + random %s)",
+        len(selected_tracks),
+        num_top_tracks,
+        num_bottom_tracks,
+        num_random_tracks,
+    )
+    logger.info(
+        "   - %s artists (top %s + bottom %s + random %s)",
+        len(selected_artists),
+        num_top_artists,
+        num_bottom_artists,
+        num_random_artists,
+    )
+    logger.info("   - Running ALL searches in parallel...")
+
+    # Limit how many searches hit Reddit at the same time (shared with every other request on this client)
+    semaphore = _reddit_search_semaphore
+
+    # Precompute every query up front, keyed by its normalized form so a track and
+    # artist (or duplicate tracks) that boil down to the same search only run once
+    track_query_keys = []
+    artist_query_keys = []
+    queries: Dict[str, str] = {}
+
+    for idx, track in enumerate(selected_tracks, 1):
+        query = f"{track['name']} {track['artist_names']} recommend"
+        key = normalize_query(query)
+        track_query_keys.append(key)
+        queries.setdefault(key, query)
+        logger.info(
+            "[Track %s/%s] Queuing: '%s'", idx, len(selected_tracks), track["name"]
         )
-        print()
-
-        # Run ALL searches in parallel (tracks + artists together)
-        all_results = await asyncio.gather(*track_search_tasks, *artist_search_tasks)
-
-        # Flatten all results and show individual search results
-        all_reddit_data = []
-
-        # Display track search results
-        for idx, results in enumerate(all_results[: len(selected_tracks)], 1):
-            track_name = selected_tracks[idx - 1]["name"]
-            if results:
-                all_reddit_data.extend(results)
-                print(f"[{idx}/{len(selected_tracks)}] Searching: '{track_name}'")
-                print(f"         Found {len(results)} recommendation posts/threads")
-            else:
-                print(f"[{idx}/{len(selected_tracks)}] Searching: '{track_name}'")
-                print(f"         No recommendations found")
-
-        # Display artist search results
-        for idx, results in enumerate(all_results[len(selected_tracks) :], 1):
-            artist_name = selected_artists[idx - 1]
-            if results:
-                all_reddit_data.extend(results)
-                print(
-                    f"[Artist {idx}/{len(selected_artists)}] Searching: '{artist_name}'"
-                )
-                print(f"         Found {len(results)} recommendation posts/threads")
-            else:
-                print(
-                    f"[Artist {idx}/{len(selected_artists)}] Searching: '{artist_name}'"
-                )
-                print(f"         No recommendations found")
 
-        print(
-            f"\nTotal Reddit data collected: {len(all_reddit_data)} posts with recommendations"
+    for idx, artist in enumerate(selected_artists, 1):
+        query = f"{artist} recommend similar"
+        key = normalize_query(query)
+        artist_query_keys.append(key)
+        queries.setdefault(key, query)
+        logger.info("[Artist %s/%s] Queuing: '%s'", idx, len(selected_artists), artist)
+
+    # Create one search task per unique query
+    search_tasks = [
+        search_reddit_with_limit(
+            semaphore,
+            reddit,
+            query,
+            subreddit_name,
+            max_reddit_posts_per_query,
+            max_comments_per_post,
         )
-        print(
-            f"   Total comments: {sum(len(post['comments']) for post in all_reddit_data)}"
+        for query in queries.values()
+    ]
+
+    logger.info(
+        "Executing %s searches in parallel (%s duplicate queries skipped)...",
+        len(search_tasks),
+        len(track_query_keys) + len(artist_query_keys) - len(search_tasks),
+    )
+
+    # Run ALL searches in parallel (tracks + artists together)
+    # return_exceptions so one failed search doesn't throw away the others
+    all_results = await asyncio.gather(*search_tasks, return_exceptions=True)
+    results_by_query = {
+        key: [] if isinstance(results, Exception) else results
+        for key, results in zip(queries, all_results)
+    }
+
+    # Degraded if any search failed (circuit open, rate limited, or a Reddit error)
+    degraded = any(isinstance(results, Exception) for results in all_results)
+    if degraded:
+        logger.warning("Some Reddit searches failed, continuing with partial results")
+
+    # Flatten all results (once per unique query), keeping each post only once
+    # popular threads match several track/artist searches and would be sent to GPT repeatedly
+    all_reddit_data = []
+    seen_urls = set()
+    for results in results_by_query.values():
+        for post in results:
+            if post["url"] not in seen_urls:
+                seen_urls.add(post["url"])
+                all_reddit_data.append(post)
+
+    # Display track search results
+    for idx, key in enumerate(track_query_keys, 1):
+        results = results_by_query[key]
+        track_name = selected_tracks[idx - 1]["name"]
+        logger.info("[%s/%s] Searching: '%s'", idx, len(selected_tracks), track_name)
+        if results:
+            logger.info("         Found %s recommendation posts/threads", len(results))
+        else:
+            logger.info("         No recommendations found")
+
+    # Display artist search results
+    for idx, key in enumerate(artist_query_keys, 1):
+        results = results_by_query[key]
+        artist_name = selected_artists[idx - 1]
+        logger.info(
+            "[Artist %s/%s] Searching: '%s'",
+            idx,
+            len(selected_artists),
+            artist_name,
         )
+        if results:
+            logger.info("         Found %s recommendation posts/threads", len(results))
+        else:
+            logger.info("         No recommendations found")
+
+    logger.info(
+        "Total Reddit data collected: %s posts with recommendations",
+        len(all_reddit_data),
+    )
+    logger.info(
+        "   Total comments: %s",
+        sum(len(post["comments"]) for post in all_reddit_data),
+    )
 
     return {
         "all_reddit_data": all_reddit_data,
         "top_tracks": selected_tracks,
         "all_artists": selected_artists,
+        "degraded": degraded,
     }
@@ -5,32 +5,74 @@ Handles Spotify authentication and operations:
 - Step 6: Search Spotify for recommended songs
 """
 
+import logging
+import asyncio
+import requests
 import spotipy
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyClientCredentials
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import os
+from circuit_breaker import CircuitBreaker, CircuitOpenError
 
+logger = logging.getLogger(__name__)
 
-def initialize_spotify(client_id: str, client_secret: str) -> spotipy.Spotify:
+# Stops calling Spotify for a while after repeated outages
+spotify_breaker = CircuitBreaker("Spotify")
+
+
+def initialize_spotify(
+    client_id: str, client_secret: str, timeout: float = 5
+) -> spotipy.Spotify:
     """
     Initialize Spotify API client
 
     Args:
         client_id: Spotify client ID
         client_secret: Spotify client secret
+        timeout: Seconds before a Spotify request times out
 
     Returns:
         Spotify client object
     """
     spotify_client_credentials = SpotifyClientCredentials(
-        client_id=client_id, client_secret=client_secret
+        client_id=client_id, client_secret=client_secret, requests_timeout=timeout
+    )
+    sp = spotipy.Spotify(
+        client_credentials_manager=spotify_client_credentials, requests_timeout=timeout
     )
-    sp = spotipy.Spotify(client_credentials_manager=spotify_client_credentials)
 
-    print("Spotify API initialized (Read-only)")
+    logger.info("Spotify API initialized (Read-only)")
     return sp
 
 
+def call_spotify(func: Callable, *args, **kwargs) -> Any:
+    """
+    Call a Spotify API method through the circuit breaker
+
+    Server errors and network failures count toward opening the circuit, client
+    errors (bad/private playlist, 4xx) mean Spotify is up and don't.
+
+    Raises:
+        CircuitOpenError: If Spotify has been failing and calls are blocked
+    """
+    spotify_breaker.check()
+    try:
+        result = func(*args, **kwargs)
+    except SpotifyException as e:
+        if e.http_status is None or e.http_status >= 500:
+            spotify_breaker.record_failure()
+        else:
+            spotify_breaker.record_success()
+        raise
+    except Exception:
+        spotify_breaker.record_failure()
+        raise
+
+    spotify_breaker.record_success()
+    return result
+
+
 def get_playlist_id(url: str) -> str:
     """Extract playlist ID from URL"""
     return url.split("playlist/")[1].split("?")[0]
@@ -49,20 +91,20 @@ def get_playlist_data(sp: spotipy.Spotify, playlist_url: str) -> Dict[str, Any]:
     """
     # Get playlist data
     playlist_id = get_playlist_id(playlist_url)
-    playlist = sp.playlist(playlist_id)
+    playlist = call_spotify(sp.playlist, playlist_id)
 
-    print("=" * 80)
-    print("PLAYLIST INFORMATION")
-    print("=" * 80)
-    print(f"Name: {playlist['name']}")
-    print(f"Owner: {playlist['owner']['display_name']}")
-    print(f"Total Tracks: {playlist['tracks']['total']}")
-    print(f"Description: {playlist['description']}")
-    print("=" * 80)
+    logger.info("=" * 80)
+    logger.info("PLAYLIST INFORMATION")
+    logger.info("=" * 80)
+    logger.info("Name: %s", playlist["name"])
+    logger.info("Owner: %s", playlist["owner"]["display_name"])
+    logger.info("Total Tracks: %s", playlist["tracks"]["total"])
+    logger.info("Description: %s", playlist["description"])
+    logger.info("=" * 80)
 
     # Extract tracks
     tracks_data = []
-    results = sp.playlist_tracks(playlist_id)
+    results = call_spotify(sp.playlist_tracks, playlist_id)
 
     for idx, item in enumerate(results["items"], 1):
         track = item["track"]
@@ -84,9 +126,11 @@ def get_playlist_data(sp: spotipy.Spotify, playlist_url: str) -> Dict[str, Any]:
                 else None,
             }
             tracks_data.append(track_info)
-            print(f"[{idx}] {track_info['name']} - {track_info['artist_names']}")
+            logger.info(
+                "[%s] %s - %s", idx, track_info["name"], track_info["artist_names"]
+            )
 
-    print(f"\nExtracted {len(tracks_data)} tracks from playlist")
+    logger.info("Extracted %s tracks from playlist", len(tracks_data))
 
     # Store for logging
     playlist_data = {
@@ -113,10 +157,15 @@ def search_spotify_song(
 
     Returns:
         dict: Track information or None if not found
+
+    Raises:
+        CircuitOpenError: If Spotify has been failing and calls are blocked
+        SpotifyException: If Spotify returned a server error
+        requests.RequestException: If Spotify couldn't be reached
     """
     try:
         query = f"track:{song_name} artist:{artist_name}"
-        results = sp.search(q=query, type="track", limit=1)
+        results = call_spotify(sp.search, q=query, type="track", limit=1)
 
         if results["tracks"]["items"]:
             track = results["tracks"]["items"][0]
@@ -136,49 +185,84 @@ def search_spotify_song(
                 else None,
                 "id": track["id"],
             }
+    except (CircuitOpenError, requests.RequestException):
+        # Spotify is down, not a missing song, let the caller report it
+        raise
+    except SpotifyException as e:
+        if e.http_status is None or e.http_status >= 500:
+            raise
+        logger.error("   Error searching for '%s': %s", song_name, e)
     except Exception as e:
-        print(f"   Error searching for '{song_name}': {e}")
+        logger.error("   Error searching for '%s': %s", song_name, e)
 
     return None
 
 
-def search_spotify_recommendations(
+async def search_spotify_recommendations(
     sp: spotipy.Spotify, gpt_recommendations: List[Dict[str, str]]
-) -> List[Dict[str, Any]]:
+) -> Dict[str, Any]:
     """
-    Step 6: Search Spotify for Recommended Songs
+    Step 6: Search Spotify for Recommended Songs (Async with parallel searches)
 
     Args:
         sp: Spotify client object
         gpt_recommendations: List of dicts with 'song' and 'artist' keys
 
     Returns:
-        list: List of found Spotify tracks
+        dict: Contains final_recommendations (found Spotify tracks, in the same order
+            as gpt_recommendations) and degraded (True if any search failed)
+
+    Raises:
+        CircuitOpenError: If every search failed because Spotify is unavailable
+            (or the search's server/network error if the circuit hasn't opened yet)
     """
-    print("=" * 80)
-    print("SEARCHING SPOTIFY FOR RECOMMENDATIONS")
-    print("=" * 80)
+    logger.info("=" * 80)
+    logger.info("SEARCHING SPOTIFY FOR RECOMMENDATIONS (PARALLEL)")
+    logger.info("=" * 80)
+
+    # spotipy is blocking, run every search in its own thread at the same time
+    # return_exceptions so one failed search doesn't throw away the others
+    spotify_tracks = await asyncio.gather(
+        *[
+            asyncio.to_thread(search_spotify_song, sp, rec["song"], rec["artist"])
+            for rec in gpt_recommendations
+        ],
+        return_exceptions=True,
+    )
+
+    errors = [track for track in spotify_tracks if isinstance(track, Exception)]
+    if errors and len(errors) == len(spotify_tracks):
+        # Nothing was searched, report Spotify as unavailable instead of "no matches"
+        raise errors[0]
 
     final_recommendations = []
 
-    for idx, rec in enumerate(gpt_recommendations, 1):
-        print(
-            f"\n[{idx}/{len(gpt_recommendations)}] Searching: {rec['song']} - {rec['artist']}"
+    for idx, (rec, spotify_track) in enumerate(
+        zip(gpt_recommendations, spotify_tracks), 1
+    ):
+        logger.info(
+            "[%s/%s] Searching: %s - %s",
+            idx,
+            len(gpt_recommendations),
+            rec["song"],
+            rec["artist"],
         )
 
-        spotify_track = search_spotify_song(sp, rec["song"], rec["artist"])
-
-        if spotify_track:
+        if isinstance(spotify_track, Exception):
+            logger.warning("         Spotify search failed: %s", spotify_track)
+        elif spotify_track:
             final_recommendations.append(spotify_track)
-            print(f"         Found on Spotify!")
-            print(f"            Album: {spotify_track['album']}")
-            print(f"            Popularity: {spotify_track['popularity']}/100")
-            print(f"            URL: {spotify_track['external_url']}")
+            logger.info("         Found on Spotify!")
+            logger.info("            Album: %s", spotify_track["album"])
+            logger.info("            Popularity: %s/100", spotify_track["popularity"])
+            logger.info("            URL: %s", spotify_track["external_url"])
         else:
-            print(f"         Not found on Spotify")
+            logger.info("         Not found on Spotify")
 
-    print(
-        f"\nSuccessfully found {len(final_recommendations)}/{len(gpt_recommendations)} recommendations on Spotify"
+    logger.info(
+        "Successfully found %s/%s recommendations on Spotify",
+        len(final_recommendations),
+        len(gpt_recommendations),
     )
 
-    return final_recommendations
+    return {"final_recommendations": final_recommendations, "degraded": bool(errors)}
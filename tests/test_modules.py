@@ -48,6 +48,38 @@ class TestSpotifyAPI:
         assert result["name"] == "Watermelon Sugar"
         assert "Harry Styles" in result["artist"]
 
+    @pytest.mark.asyncio
+    async def test_search_spotify_recommendations_keeps_order(self):
+        """Test parallel Spotify searches keep GPT's ranking and drop misses"""
+        import spotify_api
+        from circuit_breaker import CircuitOpenError
+
+        def search(sp, song_name, artist_name):
+            if song_name == "Missing":
+                return None
+            if song_name == "Failed":
+                raise CircuitOpenError("Spotify is unavailable")
+            return {
+                "name": song_name,
+                "album": "Album",
+                "popularity": 50,
+                "external_url": "url",
+            }
+
+        recs = [
+            {"song": "First", "artist": "A"},
+            {"song": "Missing", "artist": "B"},
+            {"song": "Failed", "artist": "D"},
+            {"song": "Second", "artist": "C"},
+        ]
+        with patch.object(spotify_api, "search_spotify_song", side_effect=search):
+            result = await spotify_api.search_spotify_recommendations(Mock(), recs)
+
+        names = [track["name"] for track in result["final_recommendations"]]
+        assert names == ["First", "Second"]
+        # A failed search is reported, not treated like a song that wasn't found
+        assert result["degraded"] is True
+
 
 class TestAIAnalysis:
     """Tests for ai_analysis.py"""
@@ -75,6 +107,118 @@ class TestAIAnalysis:
         assert "Song 1" in prompt
         assert "JSON array" in prompt
 
+    def test_parse_streamed_recommendations(self):
+        """Test recommendations are parsed as soon as each object is complete"""
+        from ai_analysis import parse_streamed_recommendations
+
+        buffer = '[\n  {"song": "Song 1", "artist": "Artist 1"},\n  {"song": "So'
+        recs, position = parse_streamed_recommendations(buffer)
+        assert recs == [{"song": "Song 1", "artist": "Artist 1"}]
+
+        buffer += 'ng 2", "artist": "Artist 2"}\n]'
+        recs, position = parse_streamed_recommendations(buffer, position)
+        assert recs == [{"song": "Song 2", "artist": "Artist 2"}]
+
+    def test_get_chatgpt_recommendations_raises_when_circuit_open(self):
+        """Test an OpenAI outage is raised instead of returning no recommendations"""
+        import ai_analysis
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker("OpenAI", fail_max=1)
+        breaker.record_failure()
+        client = Mock()
+
+        with patch.object(ai_analysis, "openai_breaker", breaker):
+            with pytest.raises(CircuitOpenError):
+                ai_analysis.get_chatgpt_recommendations(client, "prompt")
+
+        client.chat.completions.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_chatgpt_batcher_merges_concurrent_requests(self):
+        """Test concurrent requests share one ChatGPT call and get their own results"""
+        from ai_analysis import ChatGPTBatcher
+
+        content = (
+            '{"1": [{"song": "A", "artist": "X"}], "2": [{"song": "B", "artist": "Y"}]}'
+        )
+        client = Mock()
+        client.chat.completions.create.return_value = Mock(
+            choices=[Mock(message=Mock(content=content))]
+        )
+
+        batcher = ChatGPTBatcher(window=0.5, max_batch_size=2)
+        try:
+            results = await asyncio.gather(
+                batcher.submit(client, "prompt 1"), batcher.submit(client, "prompt 2")
+            )
+        finally:
+            await batcher.close()
+
+        assert results == [
+            [{"song": "A", "artist": "X"}],
+            [{"song": "B", "artist": "Y"}],
+        ]
+        assert client.chat.completions.create.call_count == 1
+        kwargs = client.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"] == {"type": "json_object"}
+
+    @pytest.mark.asyncio
+    async def test_chatgpt_batcher_falls_back_on_malformed_items(self):
+        """Test a batched item without song/artist falls back instead of failing later"""
+        from ai_analysis import ChatGPTBatcher
+
+        def create(**kwargs):
+            if "=== PLAYLIST" in kwargs["messages"][1]["content"]:
+                content = '{"1": [{"song": "A", "artist": "X"}], "2": [{"title": "B"}]}'
+            else:
+                content = '[{"song": "Single", "artist": "Y"}]'
+            return Mock(choices=[Mock(message=Mock(content=content))])
+
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+
+        batcher = ChatGPTBatcher(window=0.5, max_batch_size=2)
+        try:
+            results = await asyncio.gather(
+                batcher.submit(client, "prompt 1"), batcher.submit(client, "prompt 2")
+            )
+        finally:
+            await batcher.close()
+
+        assert results == [[{"song": "Single", "artist": "Y"}]] * 2
+
+    @pytest.mark.asyncio
+    async def test_chatgpt_batcher_falls_back_to_concurrent_single_calls(self):
+        """Test a failed batched call falls back to single calls made at the same time"""
+        import threading
+        from ai_analysis import ChatGPTBatcher
+
+        # Every single call waits for the others, so this only passes if they run together
+        barrier = threading.Barrier(3, timeout=5)
+
+        def create(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            if "=== PLAYLIST" in prompt:
+                return Mock(choices=[Mock(message=Mock(content="not json"))])
+            barrier.wait()
+            content = f'[{{"song": "{prompt}", "artist": "X"}}]'
+            return Mock(choices=[Mock(message=Mock(content=content))])
+
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+
+        batcher = ChatGPTBatcher(window=0.5, max_batch_size=3)
+        try:
+            results = await asyncio.gather(
+                *[batcher.submit(client, f"prompt {i}") for i in range(3)]
+            )
+        finally:
+            await batcher.close()
+
+        assert results == [[{"song": f"prompt {i}", "artist": "X"}] for i in range(3)]
+        assert client.chat.completions.create.call_count == 4
+
 
 class TestRedditAPI:
     """Tests for reddit_api.py"""
@@ -88,6 +232,378 @@ class TestRedditAPI:
         assert "top_tracks" in mock_result
         assert isinstance(mock_result["all_reddit_data"], list)
 
+    @pytest.mark.asyncio
+    async def test_search_reddit_with_limit_retries_on_rate_limit(self):
+        """Test rate limited searches are retried after backing off"""
+        import reddit_api
+        from asyncprawcore.exceptions import TooManyRequests
+
+        rate_limited = TooManyRequests(Mock(headers={"retry-after": "0"}))
+        search = AsyncMock(side_effect=[rate_limited, [{"title": "post"}]])
+
+        with patch.object(reddit_api, "search_reddit_for_recommendations", search):
+            results = await reddit_api.search_reddit_with_limit(
+                asyncio.Semaphore(1), Mock(), "query", "music"
+            )
+
+        assert results == [{"title": "post"}]
+        assert search.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_reddit_with_limit_raises_after_retries(self):
+        """Test a search that stays rate limited is raised instead of returning no posts"""
+        import reddit_api
+        from asyncprawcore.exceptions import TooManyRequests
+
+        rate_limited = TooManyRequests(Mock(headers={"retry-after": "0"}))
+        search = AsyncMock(side_effect=rate_limited)
+
+        with patch.object(reddit_api, "search_reddit_for_recommendations", search):
+            with pytest.raises(TooManyRequests):
+                await reddit_api.search_reddit_with_limit(
+                    asyncio.Semaphore(1), Mock(), "query", "music"
+                )
+
+        assert search.await_count == reddit_api.MAX_RATE_LIMIT_RETRIES + 1
+
+    @pytest.mark.asyncio
+    async def test_search_reddit_with_limit_gives_up_on_long_retry_after(self):
+        """Test a Retry-After longer than MAX_RETRY_AFTER isn't waited out"""
+        import reddit_api
+        from asyncprawcore.exceptions import TooManyRequests
+
+        rate_limited = TooManyRequests(Mock(headers={"retry-after": "600"}))
+        search = AsyncMock(side_effect=rate_limited)
+
+        with patch.object(reddit_api, "search_reddit_for_recommendations", search):
+            with pytest.raises(TooManyRequests):
+                await asyncio.wait_for(
+                    reddit_api.search_reddit_with_limit(
+                        asyncio.Semaphore(1), Mock(), "query", "music"
+                    ),
+                    timeout=5,
+                )
+
+        assert search.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_reddit_search_semaphore_shared_across_requests(self):
+        """Test every request on the shared client is bounded by the same semaphore"""
+        import reddit_api
+
+        with patch.object(reddit_api.asyncpraw, "Reddit", return_value=AsyncMock()):
+            reddit_api.get_reddit_client("id", "secret", "user", "pass", "agent")
+            semaphore = reddit_api._reddit_search_semaphore
+            reddit_api.get_reddit_client("id", "secret", "user", "pass", "agent")
+
+            assert semaphore is not None
+            assert reddit_api._reddit_search_semaphore is semaphore
+            await reddit_api.close_reddit_client()
+
+    @pytest.mark.asyncio
+    async def test_reddit_client_from_stopped_loop_is_replaced(self, caplog):
+        """Test a client left over from a stopped event loop is replaced with a warning"""
+        import reddit_api
+
+        stopped_loop = asyncio.new_event_loop()
+        stopped_loop.close()
+        old_client = Mock()
+
+        with patch.object(reddit_api, "_reddit_client", old_client), patch.object(
+            reddit_api, "_reddit_client_loop", stopped_loop
+        ), patch.object(reddit_api.asyncpraw, "Reddit", return_value=AsyncMock()):
+            client = reddit_api.get_reddit_client(
+                "id", "secret", "user", "pass", "agent"
+            )
+            assert client is not old_client
+            await reddit_api.close_reddit_client()
+
+        assert "Dropping Reddit client" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_search_reddit_uses_cache(self):
+        """Test cached queries skip Reddit and ignore case/punctuation"""
+        import reddit_api
+
+        key = reddit_api.get_search_cache_key("Taylor Swift recommend", "music", 20, 30)
+        reddit_api.search_cache.set(key, [{"title": "cached"}])
+        reddit = Mock()
+
+        try:
+            results = await reddit_api.search_reddit_for_recommendations(
+                reddit, "taylor swift, RECOMMEND!", "Music", 20, 30
+            )
+        finally:
+            reddit_api.search_cache.delete(key)
+
+        assert results == [{"title": "cached"}]
+        reddit.subreddit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_reddit_skips_loading_posts_without_comments(self):
+        """Test posts with no comments are kept without an extra load() request"""
+        import reddit_api
+
+        post = Mock(
+            title="Recommend songs similar to this",
+            selftext="",
+            score=10,
+            permalink="/r/music/comments/1",
+            num_comments=0,
+            load=AsyncMock(),
+        )
+
+        async def search(query, limit):
+            yield post
+
+        subreddit = Mock(search=search)
+        reddit = Mock(subreddit=AsyncMock(return_value=subreddit))
+
+        try:
+            results = await reddit_api.search_reddit_for_recommendations(
+                reddit, "no comments query", "music", 20, 30
+            )
+        finally:
+            reddit_api.search_cache.clear()
+
+        assert [post_data["title"] for post_data in results] == [post.title]
+        post.load.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_search_reddit_does_not_cache_failed_comment_loads(self):
+        """Test a rate limited comment load is raised instead of cached without comments"""
+        import reddit_api
+        from asyncprawcore.exceptions import TooManyRequests
+
+        rate_limited = TooManyRequests(Mock(headers={"retry-after": "0"}))
+        post = Mock(
+            title="Recommend songs similar to this",
+            selftext="",
+            score=10,
+            permalink="/r/music/comments/1",
+            num_comments=5,
+            load=AsyncMock(side_effect=rate_limited),
+        )
+
+        async def search(query, limit):
+            yield post
+
+        reddit = Mock(subreddit=AsyncMock(return_value=Mock(search=search)))
+
+        try:
+            with pytest.raises(TooManyRequests):
+                await reddit_api.search_reddit_for_recommendations(
+                    reddit, "comment load query", "music", 20, 30
+                )
+            key = reddit_api.get_search_cache_key("comment load query", "music", 20, 30)
+            assert reddit_api.search_cache.get(key) is None
+        finally:
+            reddit_api.search_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_get_reddit_recommendations_skips_duplicate_queries(self):
+        """Test queries that normalize to the same search are only run once"""
+        import reddit_api
+
+        track = {
+            "name": "Song",
+            "artists": ["Artist"],
+            "artist_names": "Artist",
+            "popularity": 50,
+        }
+        tracks_data = [track, dict(track, name="SONG!")]
+        post = {"title": "post", "url": "https://reddit.com/r/music/1", "comments": []}
+        search = AsyncMock(return_value=[post])
+
+        with patch.object(reddit_api.asyncpraw, "Reddit", return_value=AsyncMock()):
+            with patch.object(reddit_api, "search_reddit_for_recommendations", search):
+                result = await reddit_api.get_reddit_recommendations(
+                    "id", "secret", "user", "pass", "agent", tracks_data, "music"
+                )
+
+        # 2 tracks + 1 artist selected, but both tracks are the same search
+        assert search.await_count == 2
+        # Both searches found the same thread, so it's only sent to GPT once
+        assert result["all_reddit_data"] == [post]
+        assert result["degraded"] is False
+
+    @pytest.mark.asyncio
+    async def test_get_reddit_recommendations_failed_search_is_degraded(self):
+        """Test any failed search marks the Reddit data as degraded"""
+        import reddit_api
+
+        track = {
+            "name": "Song",
+            "artists": ["Artist"],
+            "artist_names": "Artist",
+            "popularity": 50,
+        }
+        post = {"title": "post", "url": "https://reddit.com/r/music/1", "comments": []}
+        search = AsyncMock(side_effect=[[post], RuntimeError("Reddit error")])
+
+        with patch.object(reddit_api.asyncpraw, "Reddit", return_value=AsyncMock()):
+            with patch.object(reddit_api, "search_reddit_for_recommendations", search):
+                result = await reddit_api.get_reddit_recommendations(
+                    "id", "secret", "user", "pass", "agent", [track], "music"
+                )
+
+        assert result["all_reddit_data"] == [post]
+        assert result["degraded"] is True
+
+    @pytest.mark.asyncio
+    async def test_get_reddit_recommendations_tied_popularity_no_duplicates(self):
+        """Test top and bottom picks don't overlap when every track has the same popularity"""
+        import reddit_api
+
+        tracks_data = [
+            {
+                "name": f"t{i}",
+                "artists": [f"Artist {i}"],
+                "artist_names": f"Artist {i}",
+                "popularity": 0,
+            }
+            for i in range(9)
+        ]
+        search = AsyncMock(return_value=[])
+
+        with patch.object(reddit_api.asyncpraw, "Reddit", return_value=AsyncMock()):
+            with patch.object(reddit_api, "search_reddit_for_recommendations", search):
+                result = await reddit_api.get_reddit_recommendations(
+                    "id", "secret", "user", "pass", "agent", tracks_data, "music"
+                )
+
+        names = [track["name"] for track in result["top_tracks"]]
+        # Same picks as a full descending sort: first 3 on top, last 3 at the bottom
+        assert names[:6] == ["t0", "t1", "t2", "t6", "t7", "t8"]
+        assert sorted(names) == [f"t{i}" for i in range(9)]
+
+
+class TestCache:
+    """Tests for cache.py"""
+
+    def test_ttl_cache_get_set(self):
+        """Test values are returned until they expire"""
+        from cache import TTLCache
+
+        cache = TTLCache(ttl=60)
+        cache.set("playlist", {"success": True})
+        assert cache.get("playlist") == {"success": True}
+
+        cache.set("expired", "value", ttl=-1)
+        assert cache.get("expired") is None
+        assert cache.get("missing") is None
+
+    def test_ttl_cache_evicts_oldest(self):
+        """Test the oldest entry is evicted once max_size is reached"""
+        from cache import TTLCache
+
+        cache = TTLCache(ttl=60, max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+
+class TestCircuitBreaker:
+    """Tests for circuit_breaker.py"""
+
+    def test_opens_after_fail_max_and_recovers(self):
+        """Test the circuit opens after repeated failures and closes after a success"""
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker("Test", fail_max=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.check()  # still closed after one failure
+
+        breaker.record_failure()
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+        breaker.reset_timeout = 0  # let a trial call through
+        assert not breaker.is_open
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+
+
+class TestEndpoint:
+    """Test FastAPI endpoint helpers"""
+
+    def test_is_cacheable_skips_empty_and_degraded_results(self):
+        """Test only complete results are cached so upstream blips get retried"""
+        from fastapi_endpoint import is_cacheable
+
+        def result(recommendations, degraded):
+            return {
+                "final_recommendations": recommendations,
+                "metadata": {"degraded": degraded},
+            }
+
+        assert is_cacheable(result([{"name": "Song"}], False)) is True
+        assert is_cacheable(result([], False)) is False
+        assert is_cacheable(result([{"name": "Song"}], True)) is False
+
+    def test_invalidate_cache_requires_admin_token(self):
+        """Test the cache can only be cleared with the admin token"""
+        import fastapi_endpoint
+        from fastapi.testclient import TestClient
+
+        client = TestClient(fastapi_endpoint.app)
+        url = "/api/cache/invalidate"
+
+        with patch.object(fastapi_endpoint, "CACHE_ADMIN_TOKEN", None):
+            assert client.post(url, json={}).status_code == 404
+
+        with patch.object(fastapi_endpoint, "CACHE_ADMIN_TOKEN", "secret"):
+            assert client.post(url, json={}).status_code == 401
+            headers = {"X-Admin-Token": "wrong"}
+            assert client.post(url, json={}, headers=headers).status_code == 401
+            headers = {"X-Admin-Token": "secret"}
+            assert client.post(url, json={}, headers=headers).json()["success"]
+
+    @pytest.mark.asyncio
+    async def test_prime_popular_playlists_caches_top_requested(self):
+        """Test the primer refreshes only the most requested playlists"""
+        import fastapi_endpoint
+
+        result = {
+            "playlist_data": {
+                "name": "Playlist",
+                "owner": "Owner",
+                "total_tracks": 1,
+                "album_art": None,
+            },
+            "tracks_data": [{}],
+            "reddit_data": [],
+            "final_recommendations": [{"name": "Song"}],
+            "metadata": {"num_requested": 1, "num_found": 1, "degraded": False},
+        }
+        pipeline = AsyncMock(return_value=result)
+
+        with patch.object(
+            fastapi_endpoint, "playlist_request_counts", fastapi_endpoint.Counter()
+        ), patch.object(fastapi_endpoint, "CACHE_PRIMER_TOP_K", 1), patch.object(
+            fastapi_endpoint, "get_recommendations", pipeline
+        ):
+            fastapi_endpoint.response_cache.clear()
+            for cache_key in ["popular", "popular", "rare"]:
+                fastapi_endpoint.record_playlist_request(cache_key)
+
+            assert await fastapi_endpoint.prime_popular_playlists() == 1
+            # Nothing was requested since that run, so nothing is refreshed
+            assert await fastapi_endpoint.prime_popular_playlists() == 0
+
+        pipeline.assert_awaited_once_with(
+            playlist_url="https://open.spotify.com/playlist/popular"
+        )
+        assert fastapi_endpoint.response_cache.get("popular").success is True
+        assert fastapi_endpoint.response_cache.get("rare") is None
+        fastapi_endpoint.response_cache.clear()
+
 
 class TestMainOrchestrator:
     """Tests for main.py orchestrator"""
@@ -100,6 +616,28 @@ class TestMainOrchestrator:
         assert NUM_RECOMMENDATIONS == 5
         assert SUBREDDIT_NAME == "music"
 
+    @pytest.mark.asyncio
+    async def test_empty_playlist_stops_before_reddit(self):
+        """Test an empty playlist raises before any Reddit search or ChatGPT call"""
+        import main
+
+        playlist_result = {"playlist_info": {"name": "Empty"}, "tracks_data": []}
+        reddit_search = AsyncMock()
+
+        with patch.object(
+            main, "get_spotify_client", return_value=Mock()
+        ), patch.object(main, "get_openai_client", return_value=Mock()), patch.object(
+            main, "get_playlist_data", return_value=playlist_result
+        ), patch.object(
+            main, "get_reddit_recommendations", reddit_search
+        ):
+            with pytest.raises(main.EmptyPlaylistError):
+                await main.get_recommendations(
+                    "https://open.spotify.com/playlist/empty"
+                )
+
+        reddit_search.assert_not_awaited()
+
     @pytest.mark.asyncio
     async def test_get_recommendations_structure(self):
         """Test get_recommendations returns proper structure"""